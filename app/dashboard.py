@@ -10,6 +10,14 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.agents.customer_agent import CustomerSupportAgent
 from src.models.intent_classifier import IntentClassifier
+from src.models.answer_retriever import AnswerRetriever
+from src.utils.downsampling import agregar_serie, reduzir_serie, paginar, contar_paginas
+from src.utils.request_log import RequestLogger
+
+# Acima deste volume os gráficos usam dados agregados e as tabelas são paginadas
+LIMIAR_GRANDE_VOLUME = 100_000
+MAX_PONTOS_GRAFICO = 500
+LINHAS_POR_PAGINA = 50
 
 # Configuração da página
 st.set_page_config(
@@ -124,22 +132,42 @@ def carregar_dados():
     df['timestamp'] = pd.to_datetime(df['timestamp']).astype(str)
     return df
 
+@st.cache_data
+def carregar_serie_conversas(max_pontos):
+    """Série de volume agregada e reduzida, calculada uma vez sobre os dados em cache"""
+    conversas_periodo, intervalo = agregar_serie(carregar_dados()['timestamp'], max_buckets=4 * max_pontos)
+    return reduzir_serie(conversas_periodo, 'timestamp', 'count', max_pontos), intervalo
+
+
+@st.cache_resource
+def carregar_request_log():
+    return RequestLogger('logs/requests.jsonl')
+
+
 @st.cache_resource
 def carregar_modelos():
-    agent = CustomerSupportAgent() if usar_gemini else None
+    request_log = carregar_request_log()
 
     clf = None
+    retriever = None
     if usar_ml:
-        clf = IntentClassifier()
+        clf = IntentClassifier(request_log=request_log)
         try:
             clf.carregar()
+            retriever = AnswerRetriever(clf).indexar()
         except:
             st.warning("⚠️ Modelo ML não encontrado. Execute: python src/models/intent_classifier.py")
 
+    agent = CustomerSupportAgent(retriever=retriever, request_log=request_log) if usar_gemini else None
+
     return agent, clf
 
 
 df = carregar_dados()
+modo_grande_volume = len(df) > LIMIAR_GRANDE_VOLUME
+
+if modo_grande_volume:
+    st.sidebar.info(f"🗄️ Modo grande volume: {len(df):,} conversas (gráficos agregados)")
 
 # Tabs principais
 tab1, tab2, tab3, tab4 = st.tabs(
@@ -181,9 +209,17 @@ with tab1:
 
                 # Resposta Gemini
                 if usar_gemini and agent:
-                    st.markdown("### 🤖 Resposta do Assistente (Gemini)")
-                    resposta = agent.atender(mensagem_usuario)
-                    st.success(resposta)
+                    atendimento = agent.atender_com_origem(mensagem_usuario)
+                    if atendimento['origem'] == 'local':
+                        st.markdown("### ⚡ Resposta do Assistente (resposta pronta, sem LLM)")
+                    else:
+                        st.markdown("### 🤖 Resposta do Assistente (Gemini)")
+                    st.success(atendimento['resposta'])
+
+                    if agent.retriever:
+                        stats = agent.retriever.estatisticas()
+                        st.caption(f"⚡ Respostas prontas sem LLM: {stats['atendidas_localmente']}"
+                                   f"/{stats['total_consultas']} ({stats['taxa_local']:.1%})")
 
                 # Classificação ML
                 if usar_ml and clf:
@@ -270,7 +306,9 @@ with tab2:
 
     with col_g1:
         st.subheader("📊 Distribuição de Categorias")
-        fig_cat = px.pie(df, names='categoria', title='Problemas por Categoria',
+        contagem_cat = df['categoria'].value_counts()
+        fig_cat = px.pie(values=contagem_cat.values, names=contagem_cat.index,
+                         title='Problemas por Categoria',
                          color_discrete_sequence=px.colors.sequential.RdBu)
         st.plotly_chart(fig_cat, width='stretch')
 
@@ -283,13 +321,20 @@ with tab2:
 
     # Conversas por dia
     st.subheader("📈 Volume de Conversas ao Longo do Tempo")
-    df_temp = df.copy()
-    df_temp['timestamp'] = pd.to_datetime(df_temp['timestamp'])
-    conversas_dia = df_temp.groupby(df_temp['timestamp'].dt.date).size().reset_index(name='count')
-
-    fig_linha = px.line(conversas_dia, x='timestamp', y='count',
-                        title='Conversas Diárias',
-                        markers=True)
+    if modo_grande_volume:
+        # Agrupa em intervalos adaptativos e reduz a linha com LTTB
+        conversas_periodo, intervalo = carregar_serie_conversas(MAX_PONTOS_GRAFICO)
+
+        fig_linha = px.line(conversas_periodo, x='timestamp', y='count',
+                            title=f'Conversas por Intervalo ({intervalo})')
+    else:
+        df_temp = df.copy()
+        df_temp['timestamp'] = pd.to_datetime(df_temp['timestamp'])
+        conversas_dia = df_temp.groupby(df_temp['timestamp'].dt.date).size().reset_index(name='count')
+
+        fig_linha = px.line(conversas_dia, x='timestamp', y='count',
+                            title='Conversas Diárias',
+                            markers=True)
     fig_linha.update_traces(line_color='#EA1D2C')
     st.plotly_chart(fig_linha, width='stretch')
 
@@ -303,7 +348,14 @@ with tab3:
 
     with col_a1:
         st.subheader("📋 Amostra de Dados")
-        st.dataframe(df.head(10), use_container_width=True)
+        if modo_grande_volume:
+            total_paginas = contar_paginas(len(df), LINHAS_POR_PAGINA)
+            pagina = st.number_input(f"Página (de {total_paginas:,})", min_value=1,
+                                     max_value=total_paginas, value=1)
+            pagina_df, _ = paginar(df, pagina, LINHAS_POR_PAGINA)
+            st.dataframe(pagina_df, use_container_width=True)
+        else:
+            st.dataframe(df.head(10), use_container_width=True)
 
     with col_a2:
         st.subheader("📊 Estatísticas Descritivas")
@@ -351,7 +403,8 @@ with tab4:
                 intencao_gemini = agent.classificar_intencao(teste_msg)
                 st.success(f"**Categoria:** {intencao_gemini}")
 
-                resposta_gemini = agent.atender(teste_msg)
+                # Sem o índice de respostas prontas, para comparar de fato com o Gemini
+                resposta_gemini = agent.atender(teste_msg, usar_retriever=False)
                 st.markdown("**Resposta:**")
                 st.write(resposta_gemini)
 
@@ -366,6 +419,10 @@ with tab4:
                     for cat, prob in resultado_ml['probabilidades'].items():
                         st.write(f"{cat}: {prob:.2%}")
 
+        if agent and agent.uso_tokens.resumo():
+            st.markdown("### 🔢 Uso de Tokens (Gemini)")
+            st.dataframe(pd.DataFrame(agent.uso_tokens.resumo()), use_container_width=True)
+
     st.markdown("---")
 
     # Tabela comparativa
@@ -1,15 +1,107 @@
 from google import genai
 from google.genai import types
 import os
+import time
+import atexit
+import logging
+import threading
+from collections import deque
 from pathlib import Path
 from dotenv import load_dotenv
 
 env_path = Path(__file__).parent.parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+logger = logging.getLogger(__name__)
+
+MODELO_PADRAO = 'gemini-2.0-flash-exp'
+
+# Validade do contexto em cache; renovado um pouco antes de expirar
+CACHE_TTL_SEGUNDOS = 3600
+CACHE_MARGEM_RENOVACAO = 60
+
+# Erros da API que indicam cache expirado/removido (404) ou inacessível (403);
+# outros erros (ex.: 429, rede) são propagados para não duplicar o tráfego
+CODIGOS_FALLBACK_CACHE = {403, 404}
+
+
+def compactar_prompt(texto):
+    """Remove indentação e linhas em branco de um template de prompt"""
+    return "\n".join(linha.strip() for linha in texto.splitlines() if linha.strip())
+
+
+# Templates montados uma única vez, já sem a indentação do código
+SYSTEM_PROMPT = compactar_prompt("""
+    Você é um assistente de atendimento do iFood, uma plataforma de delivery.
+
+    REGRAS:
+    - Seja empático e profissional
+    - Resolva o problema do cliente de forma clara
+    - Se for atraso: informe que está verificando e dê previsão
+    - Se for cancelamento: pergunte o motivo e processe
+    - Se for produto errado: ofereça reembolso ou reenvio
+    - Sempre finalize perguntando se há mais algo
+
+    Responda em português, de forma direta e amigável.
+""")
+
+INSTRUCAO_CLASSIFICACAO = compactar_prompt("""
+    Classifique a intenção da mensagem em UMA categoria:
+    - atraso
+    - produto
+    - cancelamento
+    - pagamento
+    - duvida
+
+    Responda APENAS com o nome da categoria, nada mais.
+""")
+
+
+class TokenUsageTracker:
+    """Contabiliza tokens de entrada/saída por chamada, agrupados por método e modelo"""
+
+    def __init__(self, max_chamadas=1000):
+        self._lock = threading.Lock()
+        self.chamadas = deque(maxlen=max_chamadas)
+        self.totais = {}
+
+    def registrar(self, metodo, modelo, usage_metadata):
+        """Registra o uso de tokens a partir do usage_metadata da resposta"""
+        chamada = {
+            'metodo': metodo,
+            'modelo': modelo,
+            'tokens_entrada': getattr(usage_metadata, 'prompt_token_count', None) or 0,
+            'tokens_saida': getattr(usage_metadata, 'candidates_token_count', None) or 0,
+            'tokens_cache': getattr(usage_metadata, 'cached_content_token_count', None) or 0
+        }
+
+        with self._lock:
+            self.chamadas.append(chamada)
+
+            total = self.totais.setdefault((metodo, modelo), {
+                'chamadas': 0, 'tokens_entrada': 0, 'tokens_saida': 0, 'tokens_cache': 0
+            })
+            total['chamadas'] += 1
+            total['tokens_entrada'] += chamada['tokens_entrada']
+            total['tokens_saida'] += chamada['tokens_saida']
+            total['tokens_cache'] += chamada['tokens_cache']
+
+        logger.info("tokens metodo=%s modelo=%s entrada=%d saida=%d cache=%d",
+                    metodo, modelo, chamada['tokens_entrada'], chamada['tokens_saida'],
+                    chamada['tokens_cache'])
+        return chamada
+
+    def resumo(self):
+        """Totais por (método, modelo) em formato de linhas, prontos para DataFrame"""
+        with self._lock:
+            return [
+                {'metodo': metodo, 'modelo': modelo, **total}
+                for (metodo, modelo), total in sorted(self.totais.items())
+            ]
+
 
 class CustomerSupportAgent:
-    def __init__(self):
+    def __init__(self, retriever=None, modelo=MODELO_PADRAO, usar_cache=False, request_log=None):
         # Tenta pegar do Streamlit secrets primeiro, depois do .env
         try:
             import streamlit as st
@@ -22,63 +114,166 @@ class CustomerSupportAgent:
 
         self.client = genai.Client(api_key=api_key)
 
-        self.system_prompt = """
-        Você é um assistente de atendimento do iFood, uma plataforma de delivery.
+        # Índice opcional de respostas prontas (AnswerRetriever) consultado antes do Gemini
+        self.retriever = retriever
 
-        REGRAS:
-        - Seja empático e profissional
-        - Resolva o problema do cliente de forma clara
-        - Se for atraso: informe que está verificando e dê previsão
-        - Se for cancelamento: pergunte o motivo e processe
-        - Se for produto errado: ofereça reembolso ou reenvio
-        - Sempre finalize perguntando se há mais algo
+        # RequestLogger opcional que recebe cada atendimento/classificação
+        self.request_log = request_log
 
-        Responda em português, de forma direta e amigável.
-        """
+        self.modelo = modelo
+        self.uso_tokens = TokenUsageTracker()
 
-    def atender(self, mensagem_cliente):
-        """Processa mensagem do cliente e retorna resposta"""
+        self.system_prompt = SYSTEM_PROMPT
+        self._instrucoes = {
+            'atender': SYSTEM_PROMPT,
+            'classificar_intencao': INSTRUCAO_CLASSIFICACAO
+        }
 
-        prompt = f"""
-        {self.system_prompt}
+        # metodo -> (nome do cache ou None, instante de expiração em time.monotonic())
+        self.usar_cache = usar_cache
+        self._caches = {}
+        self._renovando = set()
+        self._cache_lock = threading.Lock()
+        if usar_cache:
+            atexit.register(self.fechar)
 
-        CLIENTE: {mensagem_cliente}
+    def _criar_cache(self, instrucao):
+        """Cria o contexto em cache com o preâmbulo fixo; retorna o nome ou None se indisponível"""
+        try:
+            cache = self.client.caches.create(
+                model=self.modelo,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=instrucao,
+                    ttl=f'{CACHE_TTL_SEGUNDOS}s'
+                )
+            )
+            return cache.name
+        except Exception as e:
+            # Ex.: preâmbulo abaixo do mínimo de tokens exigido para cache
+            logger.warning("Cache de contexto indisponível, usando system instruction: %s", e)
+            return None
+
+    def _apagar_cache(self, nome):
+        try:
+            self.client.caches.delete(name=nome)
+        except Exception as e:
+            logger.warning("Falha ao apagar cache %s: %s", nome, e)
 
-        ASSISTENTE:
-        """
+    def _config(self, metodo):
+        """Envia o preâmbulo fixo como system instruction ou, se pedido, via contexto em cache"""
+        instrucao = self._instrucoes[metodo]
+
+        if self.usar_cache:
+            with self._cache_lock:
+                nome, expira_em = self._caches.get(metodo, (None, 0.0))
+                renovar = time.monotonic() >= expira_em and metodo not in self._renovando
+                if renovar:
+                    self._renovando.add(metodo)
+
+            # Chamada de rede fora do lock; as demais threads seguem com o cache atual
+            # (ainda válido pela margem de renovação) ou com system instruction
+            if renovar:
+                nome = self._criar_cache(instrucao)
+                # Sem cache (API recusou), não tenta recriar a cada chamada
+                expira_em = (time.monotonic() + CACHE_TTL_SEGUNDOS - CACHE_MARGEM_RENOVACAO
+                             if nome else float('inf'))
+                with self._cache_lock:
+                    self._caches[metodo] = (nome, expira_em)
+                    self._renovando.discard(metodo)
+
+            if nome:
+                return types.GenerateContentConfig(cached_content=nome)
+
+        return types.GenerateContentConfig(system_instruction=instrucao)
+
+    def _invalidar_cache(self, metodo):
+        """Força a recriação do cache na próxima chamada"""
+        with self._cache_lock:
+            nome, _ = self._caches.get(metodo, (None, 0.0))
+            if nome:
+                self._caches[metodo] = (None, 0.0)
+
+    def _gerar(self, metodo, conteudo):
+        """Chama o Gemini e contabiliza os tokens da resposta"""
+        config = self._config(metodo)
 
         try:
             response = self.client.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt
+                model=self.modelo,
+                contents=conteudo,
+                config=config
             )
-            return response.text
         except Exception as e:
-            return f"Erro ao processar: {str(e)}"
+            if not config.cached_content or getattr(e, 'code', None) not in CODIGOS_FALLBACK_CACHE:
+                raise
 
-    def classificar_intencao(self, mensagem):
-        """Classifica a intenção da mensagem"""
+            # Cache expirado ou removido: repete com system instruction e recria depois
+            logger.warning("Falha com contexto em cache (%s), usando system instruction: %s", metodo, e)
+            self._invalidar_cache(metodo)
+            response = self.client.models.generate_content(
+                model=self.modelo,
+                contents=conteudo,
+                config=types.GenerateContentConfig(system_instruction=self._instrucoes[metodo])
+            )
+
+        uso = self.uso_tokens.registrar(metodo, self.modelo, response.usage_metadata)
+        return response, uso
+
+    def fechar(self):
+        """Apaga os contextos em cache criados por este agente"""
+        with self._cache_lock:
+            nomes = [nome for nome, _ in self._caches.values() if nome]
+            self._caches.clear()
+
+        for nome in nomes:
+            self._apagar_cache(nome)
 
-        prompt = f"""
-        Classifique a intenção desta mensagem em UMA categoria:
-        - atraso
-        - produto
-        - cancelamento
-        - pagamento
-        - duvida
+    def _registrar_log(self, tipo, inicio, **campos):
+        """Envia o registro ao RequestLogger, se configurado"""
+        if self.request_log:
+            self.request_log.registrar(tipo, latencia_ms=(time.perf_counter() - inicio) * 1000, **campos)
 
-        Mensagem: {mensagem}
+    def atender(self, mensagem_cliente, usar_retriever=True):
+        """Processa mensagem do cliente e retorna resposta"""
+        return self.atender_com_origem(mensagem_cliente, usar_retriever)['resposta']
+
+    def atender_com_origem(self, mensagem_cliente, usar_retriever=True):
+        """Como atender, mas indica se a resposta veio do índice local, do LLM ou de um erro"""
+        inicio = time.perf_counter()
 
-        Responda APENAS com o nome da categoria, nada mais.
-        """
+        if usar_retriever and self.retriever:
+            resultado = self.retriever.buscar(mensagem_cliente)
+            if resultado:
+                self._registrar_log('atendimento', inicio, mensagem=mensagem_cliente,
+                                    resposta=resultado['resposta'], origem='local',
+                                    categoria=resultado['categoria'],
+                                    similaridade=resultado['similaridade'])
+                return {'resposta': resultado['resposta'], 'origem': 'local'}
 
         try:
-            response = self.client.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt
-            )
-            return response.text.strip().lower()
+            response, uso = self._gerar('atender', f"CLIENTE: {mensagem_cliente}\nASSISTENTE:")
+            self._registrar_log('atendimento', inicio, mensagem=mensagem_cliente,
+                                resposta=response.text, origem='llm', modelo=self.modelo,
+                                tokens_entrada=uso['tokens_entrada'], tokens_saida=uso['tokens_saida'])
+            return {'resposta': response.text, 'origem': 'llm'}
         except Exception as e:
+            self._registrar_log('atendimento', inicio, mensagem=mensagem_cliente,
+                                origem='erro', erro=str(e))
+            return {'resposta': f"Erro ao processar: {str(e)}", 'origem': 'erro'}
+
+    def classificar_intencao(self, mensagem):
+        """Classifica a intenção da mensagem"""
+        inicio = time.perf_counter()
+
+        try:
+            response, uso = self._gerar('classificar_intencao', f"Mensagem: {mensagem}")
+            categoria = response.text.strip().lower()
+            self._registrar_log('classificacao_llm', inicio, mensagem=mensagem, categoria=categoria,
+                                modelo=self.modelo, tokens_entrada=uso['tokens_entrada'],
+                                tokens_saida=uso['tokens_saida'])
+            return categoria
+        except Exception as e:
+            self._registrar_log('classificacao_llm', inicio, mensagem=mensagem, erro=str(e))
             return f"erro: {str(e)}"
 
 
@@ -117,6 +312,15 @@ if __name__ == "__main__":
         resposta3 = agent.atender(mensagem3)
         print(f"\n🤖 Assistente:\n{resposta3}\n")
 
+        print("=" * 60)
+        print("🔢 Uso de tokens")
+        print("=" * 60)
+        for total in agent.uso_tokens.resumo():
+            print(f"{total['metodo']} ({total['modelo']}): {total['chamadas']} chamadas | "
+                  f"entrada {total['tokens_entrada']} | saída {total['tokens_saida']} | "
+                  f"cache {total['tokens_cache']}")
+        print()
+
         print("=" * 60)
         print("✅ Todos os testes concluídos!")
         print("=" * 60)
@@ -0,0 +1,211 @@
+import re
+import threading
+
+import numpy as np
+from sklearn.preprocessing import normalize
+
+
+# Limiares calibrados com o modelo em models/ sobre paráfrases que não são as perguntas
+# curadas (ver PARAFRASES e NAO_RESPONDER em tests/test_answer_retriever.py):
+# 17 de 20 paráfrases passam (similaridade >= 0.63, margem >= 0.38); as três que ficam
+# de fora ("Quero cancelar meu pedido", "pedido atrasado", "Quero cancelar o meu
+# pedido agora") vão para o Gemini. Intenção
+# mista ("Meu pedido está atrasado, quero cancelar") fica com margem 0.32 e é recusada.
+# A confiança do classificador não separa os casos (>= 0.84 em todas as mensagens
+# recusadas), por isso não é usada como critério.
+LIMIAR_SIMILARIDADE = 0.6
+MARGEM_MINIMA = 0.35
+
+# TF-IDF ignora a ordem das palavras: "Não quero cancelar" fica perto de "Quero cancelar"
+NEGACOES = {'não', 'nao', 'nunca', 'nem', 'jamais'}
+
+
+def tem_negacao(texto):
+    return not NEGACOES.isdisjoint(re.findall(r'\w+', texto.lower()))
+
+
+# Pares pergunta -> resposta curados para as intenções mais comuns
+RESPOSTAS_PADRAO = [
+    {
+        'categoria': 'atraso',
+        'pergunta': 'Meu pedido está atrasado',
+        'resposta': 'Sentimos muito pela demora! Já estamos verificando com o restaurante e o entregador. '
+                    'A previsão é que seu pedido chegue nos próximos 15 minutos. Posso ajudar em mais algo?'
+    },
+    {
+        'categoria': 'atraso',
+        'pergunta': 'Quanto tempo ainda demora?',
+        'resposta': 'Seu pedido já está a caminho! A previsão atualizada de entrega é de até 15 minutos. '
+                    'Posso ajudar em mais algo?'
+    },
+    {
+        'categoria': 'atraso',
+        'pergunta': 'Pedido não chegou',
+        'resposta': 'Lamentamos pelo transtorno! Estamos verificando a localização do entregador e em '
+                    'instantes retornamos com a previsão de entrega. Posso ajudar em mais algo?'
+    },
+    {
+        'categoria': 'cancelamento',
+        'pergunta': 'Quero cancelar o pedido',
+        'resposta': 'Entendido! Para seguir com o cancelamento, pode nos contar o motivo? '
+                    'Assim que confirmar, processamos o cancelamento. Posso ajudar em mais algo?'
+    },
+    {
+        'categoria': 'cancelamento',
+        'pergunta': 'Como cancelo?',
+        'resposta': 'Você pode cancelar pelo app em "Pedidos" > "Ajuda" > "Cancelar pedido", ou eu '
+                    'posso fazer isso por você. Qual o motivo do cancelamento?'
+    },
+    {
+        'categoria': 'produto',
+        'pergunta': 'Veio item errado',
+        'resposta': 'Pedimos desculpas pelo erro! Podemos oferecer o reembolso do item ou o reenvio do '
+                    'produto correto. Qual opção você prefere?'
+    },
+    {
+        'categoria': 'produto',
+        'pergunta': 'Faltou um produto',
+        'resposta': 'Sentimos muito! Podemos reembolsar o item que faltou ou reenviá-lo. '
+                    'Qual opção você prefere?'
+    },
+    {
+        'categoria': 'pagamento',
+        'pergunta': 'Cobrado em duplicidade',
+        'resposta': 'Vamos verificar a cobrança agora mesmo. Se confirmada a duplicidade, o estorno é '
+                    'feito em até 5 dias úteis na mesma forma de pagamento. Posso ajudar em mais algo?'
+    },
+    {
+        'categoria': 'pagamento',
+        'pergunta': 'Reembolso',
+        'resposta': 'O reembolso é processado em até 5 dias úteis na mesma forma de pagamento usada no '
+                    'pedido. Posso ajudar em mais algo?'
+    },
+    {
+        'categoria': 'duvida',
+        'pergunta': 'Aceita vale refeição?',
+        'resposta': 'Sim! Aceitamos os principais vales refeição, dependendo do restaurante. Você pode '
+                    'conferir as formas de pagamento na página da loja. Posso ajudar em mais algo?'
+    },
+]
+
+
+class AnswerRetriever:
+    """Índice de respostas prontas no espaço TF-IDF do IntentClassifier"""
+
+    def __init__(self, classifier, limiar=LIMIAR_SIMILARIDADE, margem=MARGEM_MINIMA):
+        self.classifier = classifier
+        self.vectorizer = classifier.vectorizer
+        self.limiar = limiar
+        self.margem = margem
+        self.pares = []
+        self.categorias = None
+        self.negacoes = None
+        self.matriz = None
+        self.total_consultas = 0
+        self.atendidas_localmente = 0
+        self._lock = threading.Lock()
+
+    def indexar(self, pares=None):
+        """Pré-computa a matriz normalizada das perguntas curadas"""
+        self.pares = list(pares if pares is not None else RESPOSTAS_PADRAO)
+        perguntas = [par['pergunta'] for par in self.pares]
+        self.categorias = np.array([par['categoria'] for par in self.pares])
+        self.negacoes = [tem_negacao(pergunta) for pergunta in perguntas]
+
+        # Linhas com norma L2 unitária: o produto escalar já é a similaridade de cosseno.
+        # Guardada transposta (CSC) para a multiplicação com a consulta em CSR.
+        self.matriz = normalize(self.vectorizer.transform(perguntas)).T.tocsc()
+        return self
+
+    def buscar_lote(self, mensagens):
+        """Busca a melhor resposta para várias mensagens com um único produto esparso"""
+        mensagens = list(mensagens)
+        if not mensagens:
+            return []
+
+        if self.matriz is None:
+            self.indexar()
+
+        X = self.vectorizer.transform(mensagens)
+        similaridades = (normalize(X) @ self.matriz).toarray()
+        intencoes = self.classifier.model.predict(X)
+
+        melhores = similaridades.argmax(axis=1)
+        scores = similaridades[np.arange(len(melhores)), melhores]
+
+        resultados = []
+        for mensagem, linha, idx, score, intencao in zip(mensagens, similaridades, melhores, scores, intencoes):
+            par = self.pares[idx]
+
+            # Melhor resposta de outra categoria: margem pequena indica intenção mista
+            outras = linha[self.categorias != par['categoria']]
+            margem = score - (outras.max() if outras.size else 0.0)
+
+            # Negação ausente na pergunta curada inverte o sentido da resposta pronta
+            negada = tem_negacao(mensagem) and not self.negacoes[idx]
+
+            if score < self.limiar or margem < self.margem or intencao != par['categoria'] or negada:
+                resultados.append(None)
+                continue
+
+            resultados.append({
+                'categoria': par['categoria'],
+                'pergunta': par['pergunta'],
+                'resposta': par['resposta'],
+                'similaridade': float(score),
+                'margem': float(margem)
+            })
+
+        with self._lock:
+            self.total_consultas += len(resultados)
+            self.atendidas_localmente += sum(resultado is not None for resultado in resultados)
+
+        return resultados
+
+    def buscar(self, mensagem):
+        """Retorna a resposta pronta para a mensagem ou None se nenhuma passar do limiar"""
+        return self.buscar_lote([mensagem])[0]
+
+    def estatisticas(self):
+        """Resumo de quantas requisições foram atendidas sem chamar o LLM"""
+        with self._lock:
+            total, locais = self.total_consultas, self.atendidas_localmente
+
+        return {
+            'total_consultas': total,
+            'atendidas_localmente': locais,
+            'taxa_local': locais / total if total else 0.0
+        }
+
+
+# Teste
+if __name__ == "__main__":
+    from intent_classifier import IntentClassifier
+
+    print("🚀 ÍNDICE DE RESPOSTAS PRONTAS - IFOOD AI\n")
+
+    clf = IntentClassifier()
+    clf.carregar()
+
+    retriever = AnswerRetriever(clf).indexar()
+    print(f"📚 Respostas indexadas: {len(retriever.pares)}")
+
+    testes = [
+        "Meu pedido está atrasado",
+        "Como cancelo?",
+        "Veio item errado",
+        "Meu pedido está atrasado, quero cancelar",
+        "Não quero cancelar o pedido",
+        "Qual o horário de funcionamento?"
+    ]
+
+    for mensagem, resultado in zip(testes, retriever.buscar_lote(testes)):
+        print(f"\n📝 Mensagem: '{mensagem}'")
+        if resultado:
+            print(f"✅ Resposta local ({resultado['similaridade']:.1%}): {resultado['resposta']}")
+        else:
+            print("🧠 Sem resposta pronta, encaminhar ao Gemini")
+
+    stats = retriever.estatisticas()
+    print(f"\n📊 Atendidas localmente: {stats['atendidas_localmente']}/{stats['total_consultas']} "
+          f"({stats['taxa_local']:.1%})")
@@ -5,14 +5,18 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
 import joblib
 import os
+import time
 
 
 class IntentClassifier:
-    def __init__(self):
+    def __init__(self, request_log=None):
         self.vectorizer = TfidfVectorizer(max_features=100, ngram_range=(1, 2))
         self.model = MultinomialNB()
         self.classes = None
 
+        # RequestLogger opcional que recebe cada previsão
+        self.request_log = request_log
+
     def treinar(self, df):
         """Treina o modelo com os dados"""
 
@@ -61,16 +65,29 @@ class IntentClassifier:
 
     def prever(self, mensagem):
         """Prevê a categoria de uma mensagem"""
+        inicio = time.perf_counter()
+
         X = self.vectorizer.transform([mensagem])
         predicao = self.model.predict(X)[0]
         probabilidades = self.model.predict_proba(X)[0]
 
-        return {
+        resultado = {
             'categoria': predicao,
             'confianca': max(probabilidades),
             'probabilidades': dict(zip(self.classes, probabilidades))
         }
 
+        if self.request_log:
+            self.request_log.registrar(
+                'classificacao_ml',
+                mensagem=mensagem,
+                categoria=str(predicao),
+                confianca=float(resultado['confianca']),
+                latencia_ms=(time.perf_counter() - inicio) * 1000
+            )
+
+        return resultado
+
     def salvar(self, path='models/'):
         """Salva o modelo treinado"""
         os.makedirs(path, exist_ok=True)
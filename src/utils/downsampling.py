@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+
+# Intervalos candidatos para agrupar séries temporais, do mais fino ao mais grosso
+INTERVALOS = ['1min', '5min', '15min', '30min', '1h', '3h', '6h', '12h', '1D', '7D', '30D']
+
+
+def intervalo_adaptativo(inicio, fim, max_buckets=500):
+    """Escolhe o menor intervalo que cobre o período com no máximo max_buckets pontos"""
+    duracao = pd.Timestamp(fim) - pd.Timestamp(inicio)
+
+    for intervalo in INTERVALOS:
+        if duracao / pd.Timedelta(intervalo) <= max_buckets:
+            return intervalo
+
+    return INTERVALOS[-1]
+
+
+def agregar_serie(timestamps, max_buckets=500):
+    """Conta eventos por intervalo adaptativo; retorna DataFrame (timestamp, count) e o intervalo"""
+    timestamps = pd.to_datetime(timestamps)
+    intervalo = intervalo_adaptativo(timestamps.min(), timestamps.max(), max_buckets)
+
+    # resample inclui os intervalos sem tráfego com contagem zero
+    serie = pd.Series(1, index=pd.DatetimeIndex(timestamps)).resample(intervalo).size()
+    serie.index.name = 'timestamp'
+    return serie.reset_index(name='count'), intervalo
+
+
+def lttb(x, y, n_pontos):
+    """Largest-Triangle-Three-Buckets: índices dos pontos que preservam a forma da linha"""
+    n = len(x)
+    if n_pontos >= n or n_pontos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Primeiro e último pontos fixos; o miolo dividido em n_pontos - 2 buckets
+    limites = np.append(np.linspace(1, n - 1, n_pontos - 1).astype(int), n)
+
+    indices = np.empty(n_pontos, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(n_pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        prox_inicio, prox_fim = limites[i + 1], limites[i + 2]
+
+        # Vértice C: média do próximo bucket
+        cx = x[prox_inicio:prox_fim].mean()
+        cy = y[prox_inicio:prox_fim].mean()
+
+        # Escolhe o ponto do bucket que forma o maior triângulo com A e C
+        areas = np.abs((x[a] - cx) * (y[inicio:fim] - y[a]) - (x[a] - x[inicio:fim]) * (cy - y[a]))
+        a = inicio + int(areas.argmax())
+        indices[i + 1] = a
+
+    return indices
+
+
+def reduzir_serie(df, x, y, n_pontos=500):
+    """Aplica LTTB a um DataFrame ordenado por x, mantendo no máximo n_pontos linhas"""
+    if len(df) <= n_pontos:
+        return df
+
+    valores_x = df[x]
+    if pd.api.types.is_datetime64_any_dtype(valores_x):
+        valores_x = valores_x.astype('int64')
+
+    return df.iloc[lttb(valores_x.to_numpy(), df[y].to_numpy(), n_pontos)]
+
+
+def contar_paginas(total_linhas, linhas_por_pagina=50):
+    """Número de páginas necessárias para total_linhas (mínimo 1)"""
+    return max(1, -(-total_linhas // linhas_por_pagina))
+
+
+def paginar(df, pagina, linhas_por_pagina=50):
+    """Retorna apenas as linhas da página pedida (1-indexada) e o total de páginas"""
+    total_paginas = contar_paginas(len(df), linhas_por_pagina)
+    pagina = min(max(1, pagina), total_paginas)
+
+    inicio = (pagina - 1) * linhas_por_pagina
+    return df.iloc[inicio:inicio + linhas_por_pagina], total_paginas
@@ -0,0 +1,159 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLogger:
+    """Log estruturado de requisições: fila em memória + escrita em lote em JSONL numa thread separada"""
+
+    def __init__(self, caminho='logs/requests.jsonl', max_fila=10_000, tamanho_lote=200,
+                 intervalo_flush=1.0, max_bytes=50 * 1024 * 1024, rotacao_segundos=24 * 3600,
+                 comprimir=False, bloquear=False, timeout_bloqueio=0.05):
+        self.caminho = Path(f"{caminho}.gz" if comprimir else caminho)
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.max_bytes = max_bytes
+        self.rotacao_segundos = rotacao_segundos
+        self.comprimir = comprimir
+
+        # bloquear=True aplica backpressure (espera até timeout_bloqueio); senão descarta e conta
+        self.bloquear = bloquear
+        self.timeout_bloqueio = timeout_bloqueio
+
+        self.fila = queue.Queue(maxsize=max_fila)
+        self.escritos = 0
+        self.descartados = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._aberto_em = self._inicio_arquivo_ativo()
+
+        self._thread = threading.Thread(target=self._loop, name='request-log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.fechar)
+
+    def registrar(self, tipo, **campos):
+        """Enfileira um registro sem bloquear o caminho da requisição"""
+        registro = {'timestamp': datetime.now().isoformat(), 'tipo': tipo, **campos}
+
+        try:
+            if self.bloquear:
+                self.fila.put(registro, timeout=self.timeout_bloqueio)
+            else:
+                self.fila.put_nowait(registro)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.descartados += 1
+            return False
+
+    def _loop(self):
+        """Coleta lotes da fila e grava até tamanho_lote registros ou a cada intervalo_flush"""
+        while not (self._parar.is_set() and self.fila.empty()):
+            lote = []
+            limite = time.monotonic() + self.intervalo_flush
+
+            while len(lote) < self.tamanho_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self.fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            if not lote:
+                continue
+
+            # Nenhuma falha pode derrubar a thread: conta os registros perdidos e segue
+            try:
+                self._escrever(lote)
+            except Exception as e:
+                with self._lock:
+                    self.falhas += len(lote)
+                logger.warning("Falha ao gravar %d registros em %s: %s", len(lote), self.caminho, e)
+
+    def _escrever(self, lote):
+        """Grava um lote em JSONL, rotacionando o arquivo por tamanho ou idade"""
+        self._rotacionar_se_necessario()
+
+        linhas = []
+        for registro in lote:
+            try:
+                linhas.append(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            except (TypeError, ValueError) as e:
+                with self._lock:
+                    self.falhas += 1
+                logger.warning("Registro não serializável descartado: %s", e)
+
+        # backslashreplace mantém surrogates soltos como escape JSON válido (\ud800)
+        abrir = gzip.open if self.comprimir else open
+        with abrir(self.caminho, 'at', encoding='utf-8', errors='backslashreplace') as f:
+            f.write(''.join(linhas))
+
+        with self._lock:
+            self.escritos += len(linhas)
+
+    def _inicio_arquivo_ativo(self):
+        """Instante de abertura do arquivo ativo: timestamp do primeiro registro ou mtime"""
+        if not self.caminho.is_file():
+            return time.time()
+
+        try:
+            abrir = gzip.open if self.comprimir else open
+            with abrir(self.caminho, 'rt', encoding='utf-8') as f:
+                primeiro = json.loads(f.readline())
+            return datetime.fromisoformat(primeiro['timestamp']).timestamp()
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            return self.caminho.stat().st_mtime
+
+    def _rotacionar_se_necessario(self):
+        if not self.caminho.exists():
+            self._aberto_em = time.time()
+            return
+
+        excedeu_tamanho = self.caminho.stat().st_size >= self.max_bytes
+        excedeu_tempo = time.time() - self._aberto_em >= self.rotacao_segundos
+        if not (excedeu_tamanho or excedeu_tempo):
+            return
+
+        # requests.jsonl(.gz) -> requests-20240101-120000.jsonl(.gz)
+        nome = self.caminho.name
+        base, extensao = nome.split('.', 1) if '.' in nome else (nome, '')
+        sufixo = datetime.now().strftime('%Y%m%d-%H%M%S')
+        destino = self.caminho.with_name(f"{base}-{sufixo}.{extensao}" if extensao else f"{base}-{sufixo}")
+
+        contador = 1
+        while destino.exists():
+            destino = destino.with_name(f"{base}-{sufixo}-{contador}.{extensao}" if extensao
+                                        else f"{base}-{sufixo}-{contador}")
+            contador += 1
+
+        os.replace(self.caminho, destino)
+        self._aberto_em = time.time()
+
+    def fechar(self, timeout=5.0):
+        """Sinaliza a thread para esvaziar a fila e aguarda a última gravação"""
+        self._parar.set()
+        self._thread.join(timeout=timeout)
+
+    def estatisticas(self):
+        """Contadores de registros gravados, descartados, com falha de escrita e pendentes na fila"""
+        with self._lock:
+            return {
+                'escritos': self.escritos,
+                'descartados': self.descartados,
+                'falhas': self.falhas,
+                'pendentes': self.fila.qsize()
+            }
@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+
+from src.models.intent_classifier import IntentClassifier
+from src.models.answer_retriever import AnswerRetriever
+
+MODELS_PATH = Path(__file__).parent.parent / 'models'
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    clf = IntentClassifier()
+    clf.carregar(str(MODELS_PATH))
+    return clf
+
+
+@pytest.fixture
+def retriever(classifier):
+    return AnswerRetriever(classifier).indexar()
+
+
+def test_pergunta_curada_respondida_localmente(retriever):
+    resultado = retriever.buscar("Meu pedido está atrasado")
+
+    assert resultado['categoria'] == 'atraso'
+    assert resultado['similaridade'] == pytest.approx(1.0)
+
+
+# Paráfrases fora das perguntas curadas, usadas para calibrar os limiares
+PARAFRASES = {
+    "quero cancelar": 'cancelamento',
+    "Como eu cancelo?": 'cancelamento',
+    "Quero reembolso": 'pagamento',
+    "Quero o reembolso": 'pagamento',
+    "Fui cobrado em duplicidade": 'pagamento',
+    "Cobrado duas vezes, em duplicidade": 'pagamento',
+    "meu pedido esta atrasado": 'atraso',
+    "meu pedido está muito atrasado": 'atraso',
+    "Meu pedido ainda não chegou": 'atraso',
+    "O pedido não chegou ainda": 'atraso',
+    "Quanto tempo demora?": 'atraso',
+    "Ainda demora muito?": 'atraso',
+    "Veio um item errado": 'produto',
+    "Veio o item errado": 'produto',
+    "Faltou um produto no pedido": 'produto',
+    "Aceita vale refeição no app?": 'duvida',
+    "Vocês aceitam vale refeição?": 'duvida',
+}
+
+# Negação, intenção mista ou fora do índice: devem ir para o LLM
+NAO_RESPONDER = [
+    "Não quero cancelar o pedido",
+    "Nao quero cancelar",
+    "Quero cancelar o pedido? Não!",
+    "Não quero reembolso",
+    "Não veio item errado",
+    "Meu pedido não está atrasado",
+    "Meu pedido está atrasado, quero cancelar",
+    "Reembolso ou cancelar o pedido?",
+    "Qual o horário de funcionamento?",
+    "Como funciona?",
+]
+
+
+@pytest.mark.parametrize('mensagem, categoria', PARAFRASES.items())
+def test_parafrase_respondida_localmente(retriever, mensagem, categoria):
+    resultado = retriever.buscar(mensagem)
+
+    assert resultado is not None
+    assert resultado['categoria'] == categoria
+
+
+@pytest.mark.parametrize('mensagem', NAO_RESPONDER)
+def test_negacao_ou_intencao_mista_vai_para_o_llm(retriever, mensagem):
+    assert retriever.buscar(mensagem) is None
+
+
+def test_negacao_presente_na_pergunta_curada_e_aceita(retriever):
+    resultado = retriever.buscar("Pedido não chegou")
+
+    assert resultado['categoria'] == 'atraso'
+
+
+def test_categoria_divergente_do_classificador_vai_para_o_llm(classifier):
+    pares = [{'categoria': 'duvida', 'pergunta': 'Meu pedido está atrasado', 'resposta': 'x'}]
+    retriever = AnswerRetriever(classifier).indexar(pares)
+
+    assert retriever.buscar("Meu pedido está atrasado") is None
+
+
+def test_lote_vazio(retriever):
+    assert retriever.buscar_lote([]) == []
+    assert retriever.estatisticas()['total_consultas'] == 0
+
+
+def test_lote_e_estatisticas(retriever):
+    resultados = retriever.buscar_lote(["Como cancelo?", "Reembolso", "Qual o horário?"])
+
+    assert [r['categoria'] if r else None for r in resultados] == ['cancelamento', 'pagamento', None]
+    assert retriever.estatisticas() == {
+        'total_consultas': 3,
+        'atendidas_localmente': 2,
+        'taxa_local': pytest.approx(2 / 3)
+    }
@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+
+import pytest
+
+import src.agents.customer_agent as customer_agent
+from src.agents.customer_agent import (
+    CustomerSupportAgent, TokenUsageTracker, compactar_prompt,
+    CACHE_TTL_SEGUNDOS, CACHE_MARGEM_RENOVACAO
+)
+
+
+class ErroAPI(Exception):
+    def __init__(self, code):
+        super().__init__(f"erro {code}")
+        self.code = code
+
+
+class CachesStub:
+    def __init__(self):
+        self.criados = []
+        self.apagados = []
+
+    def create(self, model, config):
+        nome = f"cachedContents/{len(self.criados) + 1}"
+        self.criados.append(nome)
+        return SimpleNamespace(name=nome)
+
+    def delete(self, name):
+        self.apagados.append(name)
+
+
+class ModelsStub:
+    def __init__(self):
+        self.configs = []
+        self.erro_com_cache = None
+
+    def generate_content(self, model, contents, config):
+        self.configs.append(config)
+        if self.erro_com_cache and config.cached_content:
+            raise self.erro_com_cache
+        uso = SimpleNamespace(prompt_token_count=10, candidates_token_count=4, cached_content_token_count=6)
+        return SimpleNamespace(text='atraso', usage_metadata=uso)
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(customer_agent.time, 'monotonic', relogio)
+    return relogio
+
+
+@pytest.fixture
+def agente(monkeypatch):
+    monkeypatch.setenv('GOOGLE_API_KEY', 'teste')
+    agent = CustomerSupportAgent(usar_cache=True)
+    agent.client = SimpleNamespace(caches=CachesStub(), models=ModelsStub())
+    return agent
+
+
+def test_compactar_prompt_remove_indentacao_e_linhas_vazias():
+    assert compactar_prompt("""
+        REGRAS:
+
+        - Seja direto
+    """) == "REGRAS:\n- Seja direto"
+
+
+def test_totais_por_metodo_e_modelo():
+    tracker = TokenUsageTracker()
+    uso = SimpleNamespace(prompt_token_count=10, candidates_token_count=5, cached_content_token_count=None)
+
+    tracker.registrar('atender', 'modelo-a', uso)
+    tracker.registrar('atender', 'modelo-a', uso)
+    tracker.registrar('atender', 'modelo-b', None)
+    tracker.registrar('classificar_intencao', 'modelo-a', uso)
+
+    assert tracker.resumo() == [
+        {'metodo': 'atender', 'modelo': 'modelo-a', 'chamadas': 2,
+         'tokens_entrada': 20, 'tokens_saida': 10, 'tokens_cache': 0},
+        {'metodo': 'atender', 'modelo': 'modelo-b', 'chamadas': 1,
+         'tokens_entrada': 0, 'tokens_saida': 0, 'tokens_cache': 0},
+        {'metodo': 'classificar_intencao', 'modelo': 'modelo-a', 'chamadas': 1,
+         'tokens_entrada': 10, 'tokens_saida': 5, 'tokens_cache': 0},
+    ]
+
+
+def test_cache_renovado_apos_ttl_menos_margem(agente, relogio):
+    agente.classificar_intencao('Meu pedido atrasou')
+    agente.classificar_intencao('Meu pedido atrasou')
+    assert agente.client.caches.criados == ['cachedContents/1']
+
+    relogio.agora += CACHE_TTL_SEGUNDOS - CACHE_MARGEM_RENOVACAO - 1
+    agente.classificar_intencao('Meu pedido atrasou')
+    assert agente.client.caches.criados == ['cachedContents/1']
+
+    relogio.agora += 1
+    agente.classificar_intencao('Meu pedido atrasou')
+    assert agente.client.caches.criados == ['cachedContents/1', 'cachedContents/2']
+    assert agente.client.models.configs[-1].cached_content == 'cachedContents/2'
+
+
+@pytest.mark.parametrize('codigo', [403, 404])
+def test_fallback_para_system_instruction_quando_cache_some(agente, relogio, codigo):
+    agente.client.models.erro_com_cache = ErroAPI(codigo)
+
+    assert agente.classificar_intencao('Meu pedido atrasou') == 'atraso'
+
+    com_cache, sem_cache = agente.client.models.configs
+    assert com_cache.cached_content == 'cachedContents/1'
+    assert sem_cache.cached_content is None
+    assert sem_cache.system_instruction == customer_agent.INSTRUCAO_CLASSIFICACAO
+
+    # Cache invalidado: a próxima chamada cria outro
+    agente.client.models.erro_com_cache = None
+    agente.classificar_intencao('Meu pedido atrasou')
+    assert agente.client.caches.criados == ['cachedContents/1', 'cachedContents/2']
+
+
+def test_outros_erros_nao_repetem_a_chamada(agente, relogio):
+    agente.client.models.erro_com_cache = ErroAPI(429)
+
+    assert agente.classificar_intencao('Meu pedido atrasou').startswith('erro:')
+    assert len(agente.client.models.configs) == 1
+
+
+def test_fechar_apaga_todos_os_caches(agente, relogio):
+    agente.atender('Meu pedido atrasou')
+    agente.classificar_intencao('Meu pedido atrasou')
+
+    agente.fechar()
+
+    assert sorted(agente.client.caches.apagados) == ['cachedContents/1', 'cachedContents/2']
+    assert agente.uso_tokens.resumo()[0]['tokens_cache'] == 6
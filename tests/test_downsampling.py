@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.downsampling import (
+    intervalo_adaptativo, agregar_serie, lttb, reduzir_serie, contar_paginas, paginar
+)
+
+
+@pytest.mark.parametrize('duracao, max_buckets, esperado', [
+    ('1h', 500, '1min'),
+    ('30D', 500, '3h'),
+    ('30D', 30, '1D'),
+    ('3650D', 10, '30D'),
+])
+def test_intervalo_adaptativo(duracao, max_buckets, esperado):
+    inicio = pd.Timestamp('2024-01-01')
+    assert intervalo_adaptativo(inicio, inicio + pd.Timedelta(duracao), max_buckets) == esperado
+
+
+def test_agregar_serie_preenche_periodos_sem_trafego():
+    # Dois picos separados por dois meses sem conversas
+    timestamps = pd.Series(
+        ['2024-01-01 10:00'] * 5 + ['2024-03-01 10:00'] * 3
+    )
+
+    serie, intervalo = agregar_serie(timestamps, max_buckets=100)
+
+    assert intervalo == '1D'
+    assert serie['count'].sum() == 8
+    assert serie['count'].min() == 0
+    assert serie['timestamp'].diff().dropna().nunique() == 1
+
+
+def test_lttb_mantem_extremos_e_ordem():
+    x = np.arange(1000)
+    y = np.sin(x / 50)
+
+    indices = lttb(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_preserva_pico():
+    y = np.zeros(1000)
+    y[437] = 10
+
+    assert 437 in lttb(np.arange(1000), y, 50)
+
+
+def test_lttb_sem_reducao_quando_ha_poucos_pontos():
+    assert list(lttb([0, 1, 2], [1, 2, 3], 10)) == [0, 1, 2]
+
+
+def test_reduzir_serie_com_datas():
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=2000, freq='h'),
+        'count': np.random.default_rng(0).integers(0, 100, 2000)
+    })
+
+    reduzido = reduzir_serie(df, 'timestamp', 'count', 200)
+
+    assert len(reduzido) == 200
+    assert reduzido['timestamp'].is_monotonic_increasing
+
+
+@pytest.mark.parametrize('total, esperado', [(0, 1), (50, 1), (51, 2), (1000, 20)])
+def test_contar_paginas(total, esperado):
+    assert contar_paginas(total, 50) == esperado
+
+
+def test_paginar_limita_pagina():
+    df = pd.DataFrame({'a': range(120)})
+
+    pagina_df, total = paginar(df, 99, 50)
+
+    assert total == 3
+    assert list(pagina_df['a']) == list(range(100, 120))
+    assert len(paginar(df, 0, 50)[0]) == 50
@@ -0,0 +1,125 @@
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.utils.request_log import RequestLogger
+
+
+def ler_registros(diretorio):
+    registros = []
+    for arquivo in sorted(os.listdir(diretorio)):
+        abrir = gzip.open if arquivo.endswith('.gz') else open
+        with abrir(diretorio / arquivo, 'rt', encoding='utf-8') as f:
+            registros.extend(json.loads(linha) for linha in f)
+    return registros
+
+
+def test_grava_todos_os_registros(tmp_path):
+    log = RequestLogger(tmp_path / 'requests.jsonl', intervalo_flush=0.01)
+    for i in range(50):
+        log.registrar('classificacao_ml', i=i)
+    log.fechar()
+
+    assert log.estatisticas()['escritos'] == 50
+    assert [r['i'] for r in ler_registros(tmp_path)] == list(range(50))
+
+
+def test_rotacao_por_tamanho_sem_perder_registros(tmp_path):
+    log = RequestLogger(tmp_path / 'requests.jsonl', comprimir=True, max_bytes=500,
+                        intervalo_flush=0.01, tamanho_lote=10)
+    for i in range(200):
+        log.registrar('x', i=i, texto='abc' * i)
+        time.sleep(0.0005)
+    log.fechar()
+
+    assert len(os.listdir(tmp_path)) > 1
+    assert sorted(r['i'] for r in ler_registros(tmp_path)) == list(range(200))
+
+
+def test_rotacao_por_tempo_usa_idade_do_arquivo_existente(tmp_path):
+    caminho = tmp_path / 'requests.jsonl'
+    antigo = (datetime.now() - timedelta(days=2)).isoformat()
+    caminho.write_text(json.dumps({'timestamp': antigo, 'tipo': 'x'}) + '\n', encoding='utf-8')
+
+    log = RequestLogger(caminho, rotacao_segundos=24 * 3600, intervalo_flush=0.01)
+    log.registrar('x')
+    log.fechar()
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert len(caminho.read_text(encoding='utf-8').splitlines()) == 1
+
+
+def test_fila_cheia_descarta_e_conta(tmp_path):
+    log = RequestLogger(tmp_path / 'requests.jsonl', max_fila=5, tamanho_lote=1, intervalo_flush=0.01)
+
+    # Trava o writer: no máximo 1 registro em gravação + 5 na fila
+    liberar = threading.Event()
+    escrever = log._escrever
+    log._escrever = lambda lote: (liberar.wait(), escrever(lote))
+
+    aceitos = [log.registrar('x', i=i) for i in range(20)]
+    liberar.set()
+    log.fechar()
+
+    estatisticas = log.estatisticas()
+    assert sum(aceitos) <= 6
+    assert aceitos[-10:] == [False] * 10
+    assert estatisticas['descartados'] == aceitos.count(False) >= 14
+    assert [r['i'] for r in ler_registros(tmp_path)] == [i for i, aceito in enumerate(aceitos) if aceito]
+
+
+def test_falha_de_escrita_nao_derruba_a_thread(tmp_path):
+    caminho = tmp_path / 'requests.jsonl'
+    caminho.mkdir()
+
+    log = RequestLogger(caminho, intervalo_flush=0.01)
+    log.registrar('x')
+    time.sleep(0.2)
+
+    assert log._thread.is_alive()
+    assert log.estatisticas()['falhas'] == 1
+
+    # Caminho volta a ser gravável: a mesma thread continua escrevendo
+    caminho.rmdir()
+    log.registrar('y')
+    log.fechar()
+
+    estatisticas = log.estatisticas()
+    assert estatisticas['escritos'] == 1
+    assert estatisticas['pendentes'] == 0
+
+
+def test_registro_nao_codificavel_nao_para_o_writer(tmp_path):
+    log = RequestLogger(tmp_path / 'requests.jsonl', intervalo_flush=0.01)
+    log.registrar('x', mensagem='bad \ud800')
+    time.sleep(0.1)
+    log.registrar('x', mensagem='ok')
+    log.fechar()
+
+    assert [r['mensagem'] for r in ler_registros(tmp_path)] == ['bad \ud800', 'ok']
+    assert log.estatisticas()['escritos'] == 2
+
+
+def test_erro_inesperado_conta_falha_e_segue(tmp_path):
+    log = RequestLogger(tmp_path / 'requests.jsonl', intervalo_flush=0.01)
+
+    escrever = log._escrever
+    chamadas = []
+
+    def escrever_com_erro(lote):
+        chamadas.append(lote)
+        if len(chamadas) == 1:
+            raise RuntimeError('falha inesperada')
+        escrever(lote)
+
+    log._escrever = escrever_com_erro
+    log.registrar('x', i=1)
+    time.sleep(0.1)
+    log.registrar('x', i=2)
+    log.fechar()
+
+    assert log.estatisticas()['falhas'] == 1
+    assert [r['i'] for r in ler_registros(tmp_path)] == [2]